@@ -10,6 +10,8 @@ import (
 	"github.com/internet-measurement-network/dbos/internal/store"
 	"github.com/internet-measurement-network/dbos/pkg/redis"
 	"google.golang.org/grpc"
+	_ "google.golang.org/grpc/encoding/gzip" // Accept and answer gzip-compressed result RPCs
+	"google.golang.org/grpc/keepalive"
 )
 
 // Server implements the DBOS gRPC service
@@ -47,7 +49,12 @@ func (s *Server) Start(port string) error {
 		return err
 	}
 
-	grpcServer := grpc.NewServer()
+	// Clients keep their channel open with periodic keepalive pings, including while idle;
+	// the default policy (5m, no pings without streams) would answer those with GOAWAY
+	grpcServer := grpc.NewServer(grpc.KeepaliveEnforcementPolicy(keepalive.EnforcementPolicy{
+		MinTime:             20 * time.Second,
+		PermitWithoutStream: true,
+	}))
 	api.RegisterDBOSServer(grpcServer, s)
 
 	return grpcServer.Serve(lis)
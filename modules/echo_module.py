@@ -1,11 +1,17 @@
-import json
 import time
-from typing import Optional, Type
+import orjson
+from typing import Type
 from aiori_agent.base import BaseWorker
 from nats.aio.msg import Msg
 from aiori_agent.model import MeasurementQuery
-from pydantic import BaseModel, Field
+from pydantic import Field
 
+_time = time.time
+
+# State-report details are constant per outcome, so build them once
+_RUNNING_DETAILS = {"action": "processing_request"}
+_COMPLETED_DETAILS = {"action": "request_completed"}
+_FAILED_DETAILS = {"action": "request_failed"}
 
 class EchoQuery(MeasurementQuery):
     message: str = Field(title="Message", description="The message to echo back")
@@ -19,9 +25,7 @@ class WorkingModule(BaseWorker):
     def __init__(self, name: str, agent, nc, logger, shared):
         super().__init__(name, agent, nc, logger, shared)
 
-        self.sub_in = f"agent.{self.agent.agent_id}.{self.name}.in"
-        self.sub_out = f"agent.{self.agent.agent_id}.{self.name}.out"
-        self.sub_err = f"agent.{self.agent.agent_id}.{self.name}.error"
+        self.bind_subjects(f"agent.{self.agent.agent_id}.{self.name}")
 
     def serializer(self) -> Type[MeasurementQuery]:
         return EchoQuery
@@ -33,8 +37,8 @@ class WorkingModule(BaseWorker):
         """
         Subscribes to the input subject and echoes data to output.
         """
-        await self.nc.subscribe(self.sub_in, cb=self.handle)
         self.logger.info(f"{self.name}: Listening on {self.sub_in}")
+        await self.serve(self.sub_in, self.handle)
 
     async def handle(self, msg: Msg):
         """
@@ -42,28 +46,27 @@ class WorkingModule(BaseWorker):
         """
         request_id = None
         try:
-            data = msg.data.decode()
-            self.logger.debug(f"{self.name}: Received {data}")
-            payload = json.loads(data)
+            self.logger.debug("%s: Received %s", self.name, msg.data)
+            payload = orjson.loads(msg.data)
             request_id = payload.get("id")  # Extract request ID for state tracking
             
             # Report that we're running this specific request
             if request_id:
-                await self._report_state("running", details={"action": "processing_request"}, request_id=request_id)
+                await self._report_state("running", details=_RUNNING_DETAILS, request_id=request_id)
             
-            payload["processed_at"] = time.time()
+            payload["processed_at"] = _time()
             payload["from_module"] = self.name
 
-            await self.nc.publish(self.sub_out, json.dumps(payload).encode())
-            self.logger.debug(f"{self.name}: Published to {self.sub_out}")
+            await self.nc.publish(self.sub_out, orjson.dumps(payload))
+            self.logger.debug("%s: Published to %s", self.name, self.sub_out)
             
             # Report completion with request ID
             if request_id:
-                await self._report_state("completed", details={"action": "request_completed"}, request_id=request_id)
+                await self._report_state("completed", details=_COMPLETED_DETAILS, request_id=request_id)
         except Exception as e:
             self.logger.exception(f"{self.name}: Error during handle")
             await self.nc.publish(self.sub_err, str(e).encode())
             
             # Report error with request ID
             if request_id:
-                await self._report_state("error", str(e), details={"action": "request_failed"}, request_id=request_id)
+                await self._report_state("error", str(e), details=_FAILED_DETAILS, request_id=request_id)
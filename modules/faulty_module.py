@@ -1,12 +1,12 @@
-import json
 import time
-import random
+import orjson
 import asyncio
+from collections import OrderedDict
 from typing import Optional, Type
 from aiori_agent.base import BaseWorker
 from nats.aio.msg import Msg
 from aiori_agent.model import MeasurementQuery
-from pydantic import BaseModel, Field
+from pydantic import Field
 
 
 class FaultyQuery(MeasurementQuery):
@@ -23,10 +23,10 @@ class FaultyModule(BaseWorker):
     def __init__(self, name: str, agent, nc, logger, shared):
         super().__init__(name, agent, nc, logger, shared)
 
-        self.sub_in = f"agent.{self.agent.agent_id}.{self.name}.in"
-        self.sub_out = f"agent.{self.agent.agent_id}.{self.name}.out"
-        self.sub_err = f"agent.{self.agent.agent_id}.{self.name}.error"
-        self.processed_ids = set()
+        self.bind_subjects(f"agent.{self.agent.agent_id}.{self.name}")
+        # Insertion-ordered LRU of seen request IDs, capped so it can't grow forever
+        self.processed_ids = OrderedDict()
+        self.processed_ids_cap = shared.get("processed_ids_cap", 100_000)
 
     def serializer(self) -> Type[MeasurementQuery]:
         return FaultyQuery
@@ -35,14 +35,15 @@ class FaultyModule(BaseWorker):
         return True
 
     async def run(self):
-        await self.nc.subscribe(self.sub_in, cb=self.handle)
         self.logger.info(f"{self.name}: Listening on {self.sub_in}")
+        await self.serve(self.sub_in, self.handle)
 
     async def handle(self, msg: Msg):
         request_id = None
         try:
-            payload = json.loads(msg.data.decode())
-            self.logger.info(f"{self.name}: Received {payload}")
+            # Kept as the raw dict: the id and the echoed input are the caller's, unvalidated
+            payload = orjson.loads(msg.data)
+            self.logger.info("%s: Received %s", self.name, payload)
             request_id = payload.get("id")  # Extract request ID for state tracking
 
             # Report that we're running this specific request
@@ -52,15 +53,16 @@ class FaultyModule(BaseWorker):
             # Simulate delay
             if payload.get("delay"):
                 await asyncio.sleep(payload["delay"])
-                self.logger.debug(f"{self.name}: Finished simulated delay")
+                self.logger.debug("%s: Finished simulated delay", self.name)
 
             # Simulate crash
             if payload.get("crash"):
                 raise RuntimeError("Intentional crash triggered.")
 
             # Simulate duplicate processing (ACID)
-            message_id = payload.get("id")
+            message_id = request_id
             if message_id and message_id in self.processed_ids:
+                self.processed_ids.move_to_end(message_id)
                 self.logger.warning(
                     f"{self.name}: Duplicate message ignored: {message_id}"
                 )
@@ -69,7 +71,9 @@ class FaultyModule(BaseWorker):
                     await self._report_state("error", "Duplicate message", details={"action": "duplicate_ignored"}, request_id=request_id)
                 return
             if message_id:
-                self.processed_ids.add(message_id)
+                self.processed_ids[message_id] = None
+                if len(self.processed_ids) > self.processed_ids_cap:
+                    self.processed_ids.popitem(last=False)
 
             # Echo back
             response = {
@@ -77,7 +81,7 @@ class FaultyModule(BaseWorker):
                 "processed_at": time.time(),
                 "input": payload,
             }
-            await self.nc.publish(self.sub_out, json.dumps(response).encode())
+            await self.nc.publish(self.sub_out, orjson.dumps(response))
             
             # Report completion with request ID
             if request_id:
@@ -0,0 +1,134 @@
+"""
+Single-pass interface address enumeration via getifaddrs(3).
+
+netifaces re-runs getifaddrs() for every interface it is asked about, which makes
+a full scan quadratic in the number of interfaces. Here the linked list is walked
+once and addresses are bucketed by interface name as we go.
+"""
+import ctypes
+import ctypes.util
+import socket
+import sys
+from typing import Dict, List, Optional
+
+AF_PACKET = getattr(socket, "AF_PACKET", 17)
+
+
+class sockaddr(ctypes.Structure):
+    _fields_ = [("sa_family", ctypes.c_ushort), ("sa_data", ctypes.c_ubyte * 14)]
+
+
+class sockaddr_in(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_ubyte * 4),
+    ]
+
+
+class sockaddr_in6(ctypes.Structure):
+    _fields_ = [
+        ("sin6_family", ctypes.c_ushort),
+        ("sin6_port", ctypes.c_uint16),
+        ("sin6_flowinfo", ctypes.c_uint32),
+        ("sin6_addr", ctypes.c_ubyte * 16),
+        ("sin6_scope_id", ctypes.c_uint32),
+    ]
+
+
+class sockaddr_ll(ctypes.Structure):
+    _fields_ = [
+        ("sll_family", ctypes.c_ushort),
+        ("sll_protocol", ctypes.c_uint16),
+        ("sll_ifindex", ctypes.c_int),
+        ("sll_hatype", ctypes.c_ushort),
+        ("sll_pkttype", ctypes.c_ubyte),
+        ("sll_halen", ctypes.c_ubyte),
+        ("sll_addr", ctypes.c_ubyte * 8),
+    ]
+
+
+class ifaddrs(ctypes.Structure):
+    pass
+
+
+ifaddrs._fields_ = [
+    ("ifa_next", ctypes.POINTER(ifaddrs)),
+    ("ifa_name", ctypes.c_char_p),
+    ("ifa_flags", ctypes.c_uint),
+    ("ifa_addr", ctypes.POINTER(sockaddr)),
+    ("ifa_netmask", ctypes.POINTER(sockaddr)),
+    ("ifa_ifu", ctypes.POINTER(sockaddr)),
+    ("ifa_data", ctypes.c_void_p),
+]
+
+
+def _load_libc():
+    # The layout above (and AF_PACKET) is Linux's; other platforms use netifaces
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.getifaddrs.argtypes = [ctypes.POINTER(ctypes.POINTER(ifaddrs))]
+        libc.getifaddrs.restype = ctypes.c_int
+        libc.freeifaddrs.argtypes = [ctypes.POINTER(ifaddrs)]
+        libc.freeifaddrs.restype = None
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+# Resolved once at import rather than per scan
+_libc = _load_libc()
+
+
+def available() -> bool:
+    return _libc is not None
+
+
+def getifaddrs() -> Optional[Dict[str, Dict[str, List[str]]]]:
+    """
+    Returns `{name: {"ipv4": [...], "ipv6": [...], "mac": [...]}}` for every interface,
+    or None when getifaddrs(3) isn't usable on this platform.
+    """
+    if _libc is None:
+        return None
+
+    head = ctypes.POINTER(ifaddrs)()
+    if _libc.getifaddrs(ctypes.byref(head)) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"getifaddrs failed: {errno}")
+
+    interfaces: Dict[str, Dict[str, List[str]]] = {}
+    try:
+        ptr = head
+        while ptr:
+            entry = ptr.contents
+            ptr = entry.ifa_next
+
+            name = entry.ifa_name.decode(errors="replace")
+            bucket = interfaces.get(name)
+            if bucket is None:
+                bucket = interfaces[name] = {"ipv4": [], "ipv6": [], "mac": []}
+
+            if not entry.ifa_addr:
+                continue
+            family = entry.ifa_addr.contents.sa_family
+            if family == socket.AF_INET:
+                sin = ctypes.cast(entry.ifa_addr, ctypes.POINTER(sockaddr_in)).contents
+                bucket["ipv4"].append(socket.inet_ntop(socket.AF_INET, bytes(sin.sin_addr)))
+            elif family == socket.AF_INET6:
+                sin6 = ctypes.cast(entry.ifa_addr, ctypes.POINTER(sockaddr_in6)).contents
+                addr = socket.inet_ntop(socket.AF_INET6, bytes(sin6.sin6_addr))
+                if sin6.sin6_scope_id:
+                    # Match netifaces, which qualifies scoped addresses with the interface
+                    addr = f"{addr}%{name}"
+                bucket["ipv6"].append(addr)
+            elif family == AF_PACKET:
+                sll = ctypes.cast(entry.ifa_addr, ctypes.POINTER(sockaddr_ll)).contents
+                if sll.sll_halen:
+                    bucket["mac"].append(":".join(f"{b:02x}" for b in sll.sll_addr[: sll.sll_halen]))
+    finally:
+        _libc.freeifaddrs(head)
+
+    return interfaces
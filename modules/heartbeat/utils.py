@@ -1,23 +1,62 @@
 import getpass
 import grp
 import os
-import platform
 import pwd
-from typing import Mapping
+import socket
+import time
+from typing import Mapping, Optional
 
+try:
+    import netifaces
+except ImportError:
+    netifaces = None
+
+from heartbeat._ifaddrs import getifaddrs
 from heartbeat.model import Modules, NetworkInterface, System, Loadavg, User, ModuleSpecification
 
+# Interface addresses rarely change, so heartbeats reuse the last scan for a while.
+# The cache lives at least this long, or 5 heartbeat intervals if that is longer.
+_NET_CACHE_MIN_TTL = 30.0
+_NET_CACHE = {"t": 0.0, "data": None}
+
+# Linux rtnetlink multicast groups for link and address changes
+_RTMGRP_LINK = 0x1
+_RTMGRP_IPV4_IFADDR = 0x10
+_RTMGRP_IPV6_IFADDR = 0x100
+_NETLINK = {"sock": None, "opened": False}
+
+# Group lookups go through NSS (files, sssd, LDAP...), so each answer is kept for the process
+_GID_NAME_CACHE: dict[int, str] = {}
+_GROUPLIST_CACHE: dict[tuple[str, int], list[int]] = {}
+
+def _gid_name(gid: int) -> str:
+    """Resolves a gid to its group name, falling back to the number for unknown gids."""
+    name = _GID_NAME_CACHE.get(gid)
+    if name is None:
+        try:
+            name = grp.getgrgid(gid).gr_name
+        except KeyError:
+            name = str(gid)
+        _GID_NAME_CACHE[gid] = name
+    return name
+
+def _grouplist(user_name: str, primary_gid: int) -> list[int]:
+    key = (user_name, primary_gid)
+    gids = _GROUPLIST_CACHE.get(key)
+    if gids is None:
+        gids = _GROUPLIST_CACHE[key] = os.getgrouplist(user_name, primary_gid)
+    return gids
+
 def _safe_get_user_info(module) -> User:
     """Safely collects user information."""
     try:
         user_name = getpass.getuser()
         user_pw = pwd.getpwnam(user_name)
         primary_gid = user_pw.pw_gid
-        user_pw = pwd.getpwnam(user_name)
         try:
-            user_groups_ids = os.getgrouplist(user_name, primary_gid)
+            user_groups_ids = _grouplist(user_name, primary_gid)
             groups = [
-                grp.getgrgid(gid).gr_name for gid in user_groups_ids if gid
+                _gid_name(gid) for gid in user_groups_ids if gid
             ]  # Filter potential None gids
         except Exception as ge:
             module.logger.warning(
@@ -34,7 +73,7 @@ def _safe_get_user_info(module) -> User:
             gid = primary_gid,
             gecos = user_pw.pw_gecos,
             groups = groups,
-            loadavg = Loadavg(**dict(zip(["1m", "5m", "15m"], os.getloadavg()))) if hasattr(os, "getloadavg") else None,
+            loadavg = _safe_get_loadavg(),
         )
     except (KeyError, AttributeError, OSError) as e:
         module.logger.warning(
@@ -47,27 +86,101 @@ def _safe_get_user_info(module) -> User:
         )
         return {"error": f"Unexpected: {e}"}
 
+def _safe_get_loadavg() -> Optional[Loadavg]:
+    """Returns the 1/5/15 minute load averages where the platform provides them."""
+    if not hasattr(os, "getloadavg"):
+        return None
+    return Loadavg(**dict(zip(["1m", "5m", "15m"], os.getloadavg())))
+
 def _safe_get_system_info(module) -> System:
     """Safely collects system information."""
     try:
+        # A single uname(2); platform.platform()/processor() can read libc or shell out
+        uname = os.uname()
         return System(
-            system = platform.system(),
-            node_name = platform.node(),
-            release = platform.release(),
-            version = platform.version(),
-            machine = platform.machine(),
-            processor = platform.processor(),  # Can be empty string
-            platform = platform.platform(),  # Can be empty string
+            system = uname.sysname,
+            node_name = uname.nodename,
+            release = uname.release,
+            version = uname.version,
+            machine = uname.machine,
+            processor = uname.machine,
+            platform = f"{uname.sysname}-{uname.release}-{uname.machine}",
         )
     except Exception as e:
         module.logger.error("Error getting system info while sending heartbeat")
         return {"error": str(e)}
 
+def _netlink_socket():
+    """Opens (once) a non-blocking rtnetlink socket subscribed to interface changes."""
+    if not _NETLINK["opened"]:
+        _NETLINK["opened"] = True
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, _RTMGRP_LINK | _RTMGRP_IPV4_IFADDR | _RTMGRP_IPV6_IFADDR))
+            sock.setblocking(False)
+            _NETLINK["sock"] = sock
+        except (AttributeError, OSError):
+            # Not Linux, or netlink unavailable; fall back to the TTL alone
+            pass
+    return _NETLINK["sock"]
+
+def _network_changed() -> bool:
+    """Drains pending rtnetlink notifications, returning True if there were any."""
+    sock = _netlink_socket()
+    if sock is None:
+        return False
+    changed = False
+    while True:
+        try:
+            if not sock.recv(65536):
+                break
+            changed = True
+        except (BlockingIOError, InterruptedError):
+            break
+        except OSError:
+            # e.g. ENOBUFS after a burst of events: assume something changed
+            changed = True
+            break
+    return changed
+
 def _safe_get_network_info(module) -> Mapping[str, NetworkInterface]:
+    """Returns network interface information, rescanning only when stale or changed."""
+    ttl = max(_NET_CACHE_MIN_TTL, 5 * getattr(module, "interval", 0))
+    now = time.monotonic()
+    changed = _network_changed()
+    if not changed and _NET_CACHE["data"] is not None and now - _NET_CACHE["t"] < ttl:
+        return _NET_CACHE["data"]
+
+    data = _scan_network_info(module)
+    if "error" not in data:
+        _NET_CACHE["t"] = now
+        _NET_CACHE["data"] = data
+    return data
+
+def _scan_network_info(module) -> Mapping[str, NetworkInterface]:
     """Safely collects network interface information."""
     try:
-        import netifaces
-    except:
+        # One getifaddrs(3) sweep on Linux; None means fall back to netifaces
+        interfaces_data = getifaddrs()
+    except OSError as e:
+        module.logger.error(
+            "Could not list network interfaces while sending heartbeat"
+        )
+        return {"error": f"Cannot list interfaces: {e}"}
+
+    if interfaces_data is None:
+        interfaces_data = _scan_netifaces(module)
+        if "error" in interfaces_data:
+            return interfaces_data
+
+    return {
+        interface_name: interface_data if "error" in interface_data else NetworkInterface(**interface_data)
+        for interface_name, interface_data in interfaces_data.items()
+    }
+
+def _scan_netifaces(module) -> Mapping[str, dict]:
+    """Collects interface addresses through netifaces, one ifaddresses() call per interface."""
+    if netifaces is None:
         return {}
 
     interfaces_data = {}
@@ -79,36 +192,25 @@ def _safe_get_network_info(module) -> Mapping[str, NetworkInterface]:
         )
         return {"error": f"Cannot list interfaces: {e}"}
 
+    # Bound once instead of looked up on the module three times per interface
+    af_inet = netifaces.AF_INET
+    af_inet6 = netifaces.AF_INET6
+    af_link = netifaces.AF_LINK
+    af_packet = getattr(netifaces, "AF_PACKET", None)
+    ifaddresses = netifaces.ifaddresses
     for interface in available_interfaces:
         try:
-            addresses = netifaces.ifaddresses(interface)
+            addresses = ifaddresses(interface)
+            get = addresses.get
             # Use dict comprehension for cleaner extraction, provide empty list default
             interfaces_data[interface] = {
-                "ipv4": [
-                    addr["addr"]
-                    for addr in addresses.get(netifaces.AF_INET, [])
-                    if "addr" in addr
-                ],
-                "ipv6": [
-                    addr["addr"]
-                    for addr in addresses.get(netifaces.AF_INET6, [])
-                    if "addr" in addr
-                ],
-                "mac": [
-                    addr["addr"]
-                    for addr in addresses.get(netifaces.AF_LINK, [])
-                    if "addr" in addr
-                ],
+                "ipv4": [ip for addr in get(af_inet, ()) if (ip := addr.get("addr"))],
+                "ipv6": [ip for addr in get(af_inet6, ()) if (ip := addr.get("addr"))],
+                "mac": [ip for addr in get(af_link, ()) if (ip := addr.get("addr"))],
             }
             # Handle Linux AF_PACKET explicitly if AF_LINK is not present or empty
-            if netifaces.AF_LINK in addresses and not interfaces_data[
-                interface
-            ].get("mac"):
-                interfaces_data[interface]["mac"] = [
-                    addr["addr"]
-                    for addr in addresses.get(netifaces.AF_LINK, [])
-                    if "addr" in addr
-                ]
+            if af_packet in addresses and not interfaces_data[interface]["mac"]:
+                interfaces_data[interface]["mac"] = [ip for addr in get(af_packet, ()) if (ip := addr.get("addr"))]
 
         except Exception as ie:
             module.logger.error(
@@ -116,7 +218,7 @@ def _safe_get_network_info(module) -> Mapping[str, NetworkInterface]:
             )
             interfaces_data[interface] = {"error": f"Retrieval failed: {ie}"}
 
-    return { interface_name: NetworkInterface(**interface_data) for interface_name, interface_data in interfaces_data.items()}
+    return interfaces_data
 
 def _safe_agent_version(module):
     return {}
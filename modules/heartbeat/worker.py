@@ -1,20 +1,17 @@
 import asyncio
+import hashlib
 import os
-import json
 import time
-import getpass
-import pwd, grp
 import socket
 import traceback
-import platform
+from typing import Optional
 
-from aiori_agent.base import BaseWorker
-from aiori_agent.utils import check_package_availability, install_package
+import orjson
 
-from nats.aio.msg import Msg
+from aiori_agent.base import BaseWorker
 
-from heartbeat.utils import _safe_get_user_info, _safe_get_system_info, _safe_get_network_info, _safe_agent_version, _safe_loaded_modules
-from heartbeat.model import Agent, HeartbeatModel
+from heartbeat.utils import _safe_get_user_info, _safe_get_system_info, _safe_get_network_info, _safe_loaded_modules
+from heartbeat.model import NetworkInterface, System, User
 
 class HeartbeatModule(BaseWorker):
     """
@@ -29,64 +26,175 @@ class HeartbeatModule(BaseWorker):
 
         self.interval = shared.get("interval", 2)  # seconds
         self.tags = shared.get("tags", {})
+        # Unchanged heartbeats go out as a compact delta; a full one is still sent every Nth tick
+        self.full_every = max(1, shared.get("full_every", 10))
+        self.sub_delta = f"{self.sub_out}.delta"
+        # The server asks for a full heartbeat here when a delta arrives for an agent it doesn't know
+        self.sub_resync = f"agent.{self.agent.agent_id}.{self.name}.resync"
+        self.sub_notif = "agent.notif"
+
+        # Start/stop notifications never change for a given module, so they're encoded once
+        self._notif_start = orjson.dumps({"message": "Started module", "name": self.name})
+        self._notif_stop = orjson.dumps({"message": "Stopped module", "name": self.name})
+
+        self._cached_system = None
+        self._cached_user_static = None
+        self._cached_hostname = None
+        self._cached_pid = None
+        self._cached_tz = None
+
+        # JSON-ready fragments of the heartbeat, rebuilt only when their source changes
+        self._agent_static_json = None
+        self._user_static_json = None
+        self._network_src = None
+        self._network_json = None
+        self._modules_src = None
+        self._modules_json = None
+
+        self._last_hash = None
+        self._tick = 0
 
     async def setup(self):
-        # if not check_package_availability("netifaces"):
-        #     install_package("netifaces")
-        #     await asyncio.sleep(5)
-        # return check_package_availability("netifaces")
+        # netifaces is optional: utils imports it lazily and only as a non-Linux fallback
+        self._init_static_identity()
         return True
 
+    def _init_static_identity(self):
+        """Collects the parts of the agent identity that can't change while the process runs."""
+        self._cached_system = _safe_get_system_info(self)
+        self._cached_user_static = _safe_get_user_info(self)
+        self._cached_hostname = socket.gethostname()
+        self._cached_pid = os.getpid()
+        self._cached_tz = list(time.tzname)  # Tuple like ('IST', 'IST') or ('EST', 'EDT') - (Non Day Light Saving Timezone, Day Light Saving Timezone)
+
+        # Dumped once so ticks don't re-run pydantic over fields that never change
+        system = self._cached_system
+        user = self._cached_user_static
+        self._agent_static_json = {
+            "hostname": self._cached_hostname,
+            "id": self.agent.agent_id,
+            "name": self.agent.agent_name,
+            "pid": self._cached_pid,
+            "system": system.model_dump(mode="json") if isinstance(system, System) else system,
+            "timezone": self._cached_tz,
+        }
+        # Lookup failures leave the partial-info dict, which is passed through as is
+        self._user_static_json = user.model_dump(mode="json") if isinstance(user, User) else user
+
+    def _build_user_dynamic(self) -> dict:
+        """Refreshes only the per-tick user fields on top of the cached identity."""
+        user = self._user_static_json
+        if "error" in user:
+            return user
+        return {**user, "working_dir": os.getcwd(), "loadavg": self._loadavg_json()}
+
+    @staticmethod
+    def _loadavg_json():
+        """`Loadavg.model_dump()` without building the model: getloadavg() always yields three floats."""
+        if not hasattr(os, "getloadavg"):
+            return None
+        one, five, fifteen = os.getloadavg()
+        return {"field_15m": fifteen, "field_1m": one, "field_5m": five}
+
+    def _build_network(self) -> dict:
+        network = _safe_get_network_info(self)
+        if network is not self._network_src:
+            # The scan result is cached upstream, so this only re-dumps after a rescan
+            self._network_src = network
+            self._network_json = {
+                name: iface.model_dump() if isinstance(iface, NetworkInterface) else iface
+                for name, iface in network.items()
+            }
+        return self._network_json
+
+    def _build_modules(self) -> dict:
+        workers = tuple(self.agent.manager.running_workers.items())
+        if workers != self._modules_src:
+            # Only rebuild the module specs (and their JSON schemas) after a load/reload
+            self._modules_src = workers
+            self._modules_json = _safe_loaded_modules(self).model_dump()
+        return self._modules_json
+
     async def run(self):
         """
         Subscribes to the input subject and echoes data to output.
         """
 
         self.logger.info(f"{self.name}: Broascasting on {self.sub_out}")
-        await self.nc.publish(
-            "agent.notif",
-            json.dumps({"message": f"Started module", "name": self.name}).encode(),
-        )
+        await self.nc.publish(self.sub_notif, self._notif_start)
 
         self.logger.info(f"{self.name}: Starting heartbeat every {self.interval}s")
 
+        resync = await self.nc.subscribe(self.sub_resync, cb=self._handle_resync)
         try:
+            # The first tick runs every probe cold (interface scan, NSS lookups), so build it
+            # on a worker thread; later ticks hit the caches and are cheaper inline than a hop
+            loop = asyncio.get_running_loop()
+            agent_info = await loop.run_in_executor(None, self._get_agent_info)
+            # Bound to locals so each tick skips the global/attribute lookups
+            sleep = asyncio.sleep
+            interval = self.interval
+            send = self._send_heartbeat
+            await send(agent_info)
+            await sleep(interval)
             while self.running:
-                await self._send_heartbeat()
-                await asyncio.sleep(self.interval)
+                await send()
+                await sleep(interval)
         except asyncio.CancelledError as cex:
-            self.logger.warning(f"{self.name}: Cancelled")
-            await self.nc.publish(
-                "agent.notif",
-                json.dumps({"message": f"Stopped module", "name": self.name}).encode(),
-            )
+            self.logger.warning("%s: Cancelled", self.name)
+            await self.nc.publish(self.sub_notif, self._notif_stop)
         except Exception as exception:
-            self.logger.exception(f"{self.name}: Error in run loop")
+            self.logger.exception("%s: Error in run loop", self.name)
             tb = traceback.format_exc()
             error_data = {"module": self.name, "traceback": tb, "error": str(exception)}
-            await self.nc.publish(self.sub_err, json.dumps(error_data).encode())
-
-    def _get_agent_info(self) -> Agent:
-        """Constructs the complete heartbeat data payload."""
-        return Agent(
-            id = self.agent.agent_id,
-            name = self.agent.agent_name,
-            timezone = list(time.tzname),  # Tuple like ('IST', 'IST') or ('EST', 'EDT') - (Non Day Light Saving Timezone, Day Light Saving Timezone)
-            hostname = socket.gethostname(),
-            pid = os.getpid(),
-            user = _safe_get_user_info(self),
-            system = _safe_get_system_info(self),
-            network = _safe_get_network_info(self),
-            modules = _safe_loaded_modules(self)
-        )
-
-    async def _send_heartbeat(self):
-        # Create a trace group for this module operation
-        heartbeat = HeartbeatModel(
-            module = self.name,
-            timestamp = time.time(),
-            agent = self._get_agent_info(),
-            tags = self.tags,
-        )
-        await self.nc.publish(self.sub_out, heartbeat.model_dump_json().encode())
-        self.logger.debug(f"{self.name}: Published heartbeat → {self.sub_out}")
+            await self.nc.publish(self.sub_err, orjson.dumps(error_data))
+        finally:
+            try:
+                await resync.unsubscribe()
+            except Exception as e:
+                self.logger.warning("%s: Failed to unsubscribe from %s: %s", self.name, self.sub_resync, e)
+
+    async def _handle_resync(self, msg):
+        """Forgets the last digest, so the next tick sends a full heartbeat instead of a delta."""
+        self.logger.info("%s: Full heartbeat requested on %s", self.name, self.sub_resync)
+        self._last_hash = None
+
+    def _get_agent_info(self) -> dict:
+        """Constructs the agent section of the heartbeat, shaped like `heartbeat.model.Agent`."""
+        return {
+            **self._agent_static_json,
+            "modules": self._build_modules(),
+            "network": self._build_network(),
+            "user": self._build_user_dynamic(),
+        }
+
+    def _static_digest(self, agent: dict) -> bytes:
+        """Hashes the parts of the heartbeat that only change on a reload, rescan or chdir."""
+        static = orjson.dumps((agent["modules"], agent["network"], agent["user"].get("working_dir"), self.tags))
+        return hashlib.blake2b(static, digest_size=16).digest()
+
+    async def _send_heartbeat(self, agent_info: Optional[dict] = None):
+        agent = agent_info if agent_info is not None else self._get_agent_info()
+        timestamp = time.time()
+        digest = self._static_digest(agent)
+        tick = self._tick
+        self._tick += 1
+
+        if digest == self._last_hash and tick % self.full_every:
+            delta = {"a": self.agent.agent_id, "m": self.name, "t": timestamp, "h": digest.hex()}
+            await self.nc.publish(self.sub_delta, orjson.dumps(delta))
+            self.logger.debug("%s: Published heartbeat delta → %s", self.name, self.sub_delta)
+            return
+
+        # Same document HeartbeatModel.model_dump_json() produced, without per-tick validation
+        heartbeat = {
+            "agent": agent,
+            "module": self.name,
+            "tags": self.tags,
+            "timestamp": timestamp,
+        }
+        await self.nc.publish(self.sub_out, orjson.dumps(heartbeat))
+        self._last_hash = digest
+        # Restart the count so the next full heartbeat is a full cycle away
+        self._tick = 1
+        self.logger.debug("%s: Published heartbeat → %s", self.name, self.sub_out)
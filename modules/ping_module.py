@@ -1,8 +1,7 @@
-import json
-import time
+import orjson
 import logging
 import asyncio
-from typing import Any, Optional, Type
+from typing import Any, Type
 from ipaddress import IPv4Address, IPv6Address
 
 from aiori_agent.agent import Agent
@@ -14,13 +13,25 @@ from nats.aio.msg import Msg
 from aiori_agent.model import Hostname, Domain, MeasurementQuery
 from aiori_agent.utils import check_package_availability, install_package
 
-from pydantic import BaseModel, Field
+from pydantic import Field
+
+# Resolved once here rather than on every request; setup() installs and rebinds them if missing
+try:
+    from icmplib import async_ping
+    from tcping import TCPing
+except ImportError:
+    async_ping = None
+    TCPing = None
+
+# Third-party packages setup() installs on demand
+REQUIRED_PACKAGES = ("icmplib",)
 
 
 class PingQuery(MeasurementQuery):
     host: IPv4Address | IPv6Address | Hostname | Domain = Field(title="Host", description="This field requires either the IP Address, Hostname or the FQDN of the host system to ping", examples=["8.8.8.8", "1.1.1.1"])
     count: int = Field(default=3, title="Count", description="How many times will the host be pinged for measurement")
     port: int = Field(default=80, title="Port", description="Which port to ping to")
+    parallel: bool = Field(default=False, title="Parallel", description="Start the TCP probe alongside ICMP instead of only after ICMP fails")
 
 class PingModule(BaseWorker):
     """
@@ -37,32 +48,76 @@ class PingModule(BaseWorker):
     ):
         super().__init__(name, agent, nc, logger, shared)
         # Use simple naming pattern like the working module
-        self.sub_in = f"agent.{self.agent.agent_id}.in"
-        self.sub_out = f"agent.{self.agent.agent_id}.out"
-        self.sub_err = f"agent.{self.agent.agent_id}.error"
-        self.subscription = None
+        self.bind_subjects(f"agent.{self.agent.agent_id}")
 
     def serializer(self, ) -> Type[MeasurementQuery]:
         return PingQuery
 
     async def setup(self):
-        if not check_package_availability("icmplib"):
-            install_package("icmplib")
-
-        await asyncio.sleep(5)
-        return check_package_availability("icmplib")
+        global async_ping, TCPing
+        missing = [package for package in REQUIRED_PACKAGES if not check_package_availability(package)]
+        if missing:
+            for package in missing:
+                install_package(package)
+            await asyncio.sleep(5)
+            if not all(check_package_availability(package) for package in missing):
+                return False
+        if async_ping is None:
+            from icmplib import async_ping
+            from tcping import TCPing
+        return True
 
     async def run(self):
         """
         Subscribes to the input subject and starts handling ping requests.
         """
         try:
-            self.subscription = await self.nc.subscribe(self.sub_in, cb=self.handle)
             self.logger.info(f"{self.name}: Listening on {self.sub_in}")
+            await self.serve(self.sub_in, self.handle)
         except Exception as e:
             self.logger.error(f"{self.name}: Failed to subscribe to {self.sub_in}: {e}")
             raise
 
+    async def _ping(self, query: PingQuery):
+        """
+        Pings over ICMP, falling back to TCP when ICMP can't be used (e.g. no raw socket permission).
+
+        With `query.parallel` both probes start together, so a failed ICMP attempt costs
+        max(icmp, tcp) instead of icmp + tcp; the TCP probe is cancelled if ICMP succeeds.
+        """
+        host = str(query.host)
+        icmp = async_ping(
+            address=host, 
+            count=query.count, 
+            interval=1, 
+            timeout=5
+        )
+
+        if not query.parallel:
+            try:
+                return await icmp
+            except Exception:
+                return await self._tcp_ping(host, query.port, query.count, timeout=5)
+
+        icmp_task = asyncio.create_task(icmp)
+        tcp_task = asyncio.create_task(self._tcp_ping(host, query.port, query.count, timeout=5))
+        try:
+            try:
+                return await icmp_task
+            except Exception:
+                return await tcp_task
+        finally:
+            # Also reached when the handler itself is cancelled (worker stop, hot reload),
+            # so neither probe keeps hitting the target with nobody waiting on it
+            icmp_task.cancel()
+            tcp_task.cancel()
+
+    async def _tcp_ping(self, host: str, port: int, count: int, timeout: float):
+        """
+        Measures TCP connect RTTs through `TCPing`, whose probes keep their 1 s spacing.
+        """
+        return await TCPing(host=host, port=port, count=count, timeout=timeout).ping()
+
     async def handle(self, msg: Msg):
         """
         Processes incoming ping requests and sends results.
@@ -70,39 +125,25 @@ class PingModule(BaseWorker):
         """
         request_id = None
         try:
-            # Log raw message for debugging
-            self.logger.debug(f"Received raw message: {msg.data.decode()}")
-
-            data = json.loads(msg.data.decode())
-            request_id = data.get("id")  # Extract request ID for state tracking
-
-            query = PingQuery(**data)
-            model_type = PingQuery.model_type()
+            logger = self.logger
+            raw = msg.data
+            # Log raw message for debugging; orjson parses the bytes directly
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received raw message: %s", raw)
+
+            # Parsed once by orjson: the state reports are keyed by the caller's id exactly as sent
+            # (pydantic would normalize a UUID's case), also when validation then fails
+            payload = orjson.loads(raw)
+            if isinstance(payload, dict):
+                request_id = payload.get("id")
+            query = PingQuery.model_validate(payload)
 
             # Report that we're running this specific request
             if request_id:
                 await self._report_state("running", details={"action": "processing_request"}, request_id=request_id)
 
             # Execute ping
-            from icmplib import Host
-            try:
-                from icmplib import async_ping
-                ping_result = await async_ping(
-                    address=str(query.host), 
-                    count=query.count, 
-                    interval=1, 
-                    timeout=5
-                )
-
-            except Exception as ex:
-                from tcping import TCPing
-                async_ping = TCPing(
-                    host = str(query.host), 
-                    port = query.port, 
-                    count = query.count, 
-                    timeout = 5
-                )
-                ping_result = await async_ping.ping()
+            ping_result = await self._ping(query)
 
             result = {
                 "id": str(query.id),
@@ -112,16 +153,16 @@ class PingModule(BaseWorker):
                 "packets_sent": ping_result.packets_sent,
             }
 
-            self.logger.info(f"{self.name}: Ping completed with result: {result}")
-            await self.nc.publish(self.sub_out, json.dumps(result).encode("utf-8"))
-            self.logger.debug(f"{self.name}: Published to {self.sub_out}")
+            logger.info("%s: Ping completed with result: %s", self.name, result)
+            await self.nc.publish(self.sub_out, orjson.dumps(result))
+            logger.debug("%s: Published to %s", self.name, self.sub_out)
 
             # Report completion with request ID
             if request_id:
                 await self._report_state("completed", details={"action": "request_completed"}, request_id=request_id)
 
         except Exception as e:
-            self.logger.exception(f"{self.name}: Error during handle")
+            self.logger.exception("%s: Error during handle", self.name)
             await self.nc.publish(self.sub_err, str(e).encode("utf-8"))
             
             # Report error with request ID
@@ -1,112 +1,217 @@
 import grpc
+import queue
+import atexit
+import orjson
 import asyncio
+import logging
+import logging.handlers
+import itertools
+import time
+from collections.abc import Mapping
 from typing import Dict, Any, Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 
 # Import the generated gRPC client code
 import dbos_pb2
 import dbos_pb2_grpc
 
+# RPC failures are logged through a queue so a burst of errors never writes to stdout from the
+# event loop thread; a listener thread does the actual writes, and only while a client is connected
+logger = logging.getLogger("dbos_client")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener_running = False
+
+
+def _start_log_listener() -> None:
+    global _log_listener_running
+    if not _log_listener_running:
+        _log_listener.start()
+        _log_listener_running = True
+
+
+def _stop_log_listener() -> None:
+    """Writes out whatever is still queued, then joins the listener thread."""
+    global _log_listener_running
+    if _log_listener_running:
+        _log_listener.stop()
+        _log_listener_running = False
+
+
+atexit.register(_stop_log_listener)
+
+# The channel is opened once and shared by every RPC, so keep it warm across idle periods
+# instead of letting NATs/load balancers silently drop it and paying a reconnect later
+_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Spare StoreResultRequests, cleared and reused across calls; capped so a burst doesn't pin memory
+_STORE_REQUEST_POOL: List[dbos_pb2.StoreResultRequest] = []
+_STORE_REQUEST_POOL_MAX = 64
+
+# ListAgentsRequest has no fields, so one instance can be shared by every (concurrent) call
+_LIST_AGENTS_REQUEST = dbos_pb2.ListAgentsRequest()
+
+
+def _encode_config(config: Dict[str, Any], target) -> None:
+    """
+    Writes an agent config into the proto's map<string,string> `target`, one JSON document per key.
+
+    Heartbeat configs nest dicts under "agent", which the map can't hold directly; encoding
+    each value keeps the wire schema (and dbos-go) unchanged. Strings are encoded too, so
+    decoding can't mistake a value like "123" for a number.
+    """
+    dumps = orjson.dumps
+    target.update((key, dumps(value).decode()) for key, value in config.items())
+
+
+def _decode_config_value(value: str) -> Any:
+    """Inverse of `_encode_config` for one value; values stored before it was used stay plain strings."""
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        return value
+
+
+class _LazyConfig(Mapping):
+    """
+    Read-only view of an Agent proto's config map that decodes each value on first access.
+
+    Most callers of the agent listings never look at the config, so nothing is decoded
+    (or copied out of the proto) unless they do.
+    """
+
+    __slots__ = ("_raw", "_decoded")
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._decoded = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+        # Indexing a proto map with a missing key would insert it, so check membership first
+        if key not in self._raw:
+            raise KeyError(key)
+        value = self._decoded[key] = _decode_config_value(self._raw[key])
+        return value
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+
+def _agent_to_dict(agent_proto) -> Dict[str, Any]:
+    """Converts an Agent proto into the field layout of the server's AgentInfo."""
+    return {
+        'agent_id': agent_proto.id,
+        'hostname': agent_proto.hostname,
+        'alive': agent_proto.alive,
+        # Epochs are UTC; an explicit tz skips the local-time conversion and matches AgentInfo
+        'last_seen': datetime.fromtimestamp(agent_proto.last_seen, timezone.utc),
+        'first_seen': datetime.fromtimestamp(agent_proto.first_seen, timezone.utc),
+        'config': _LazyConfig(agent_proto.config),
+        'total_heartbeats': agent_proto.total_heartbeats
+    }
+
+
 class DBOSClient:
-    def __init__(self, dbos_address: str = "localhost:50051"):
+    def __init__(self, dbos_address: str = "localhost:50051", pool_size: int = 4):
         self.dbos_address = dbos_address
-        self.channel = None
-        self.stub = None
+        self.pool_size = max(1, pool_size)
+        self._channels: List[grpc.aio.Channel] = []
+        self._stubs: List[dbos_pb2_grpc.DBOSStub] = []
+        self._rr = itertools.count()
         
     async def connect(self):
         """Establish connection to DBOS service"""
-        if self.channel is None:
-            self.channel = grpc.aio.insecure_channel(self.dbos_address)
-            self.stub = dbos_pb2_grpc.DBOSStub(self.channel)
+        # Started here rather than at import, so a server running without DBOS has no extra thread
+        _start_log_listener()
+        if not self._channels:
+            # A local subchannel pool gives every channel its own HTTP/2 connection, so concurrent
+            # RPCs are spread over several TCP streams instead of queueing behind one
+            options = _CHANNEL_OPTIONS + [("grpc.use_local_subchannel_pool", 1)]
+            self._channels = [
+                grpc.aio.insecure_channel(self.dbos_address, options=options)
+                for _ in range(self.pool_size)
+            ]
+            self._stubs = [dbos_pb2_grpc.DBOSStub(channel) for channel in self._channels]
             
     async def disconnect(self):
         """Close connection to DBOS service"""
-        if self.channel:
-            await self.channel.close()
-            self.channel = None
-            self.stub = None
+        channels, self._channels, self._stubs = self._channels, [], []
+        for channel in channels:
+            await channel.close()
+        logger.info("DBOS client disconnected")
+        _stop_log_listener()
+
+    def _stub(self) -> dbos_pb2_grpc.DBOSStub:
+        """Round-robins RPCs over the channel pool."""
+        # connect() is awaited once up front (initialize_dbos_client), not checked on every RPC
+        assert self._stubs, "DBOSClient.connect() must be awaited before making calls"
+        return self._stubs[next(self._rr) % len(self._stubs)]
             
     async def register_agent(self, agent_info) -> bool:
         """Register an agent with DBOS"""
-        if not self.stub:
-            await self.connect()
-            
         try:
-            # Convert AgentInfo to DBOS Agent protobuf message
-            agent_proto = dbos_pb2.Agent(
-                id=agent_info.agent_id,
-                hostname=agent_info.hostname,
-                alive=agent_info.alive,
-                last_seen=int(agent_info.last_seen.timestamp()),
-                first_seen=int(agent_info.first_seen.timestamp()),
-                config=agent_info.config,
-                total_heartbeats=agent_info.total_heartbeats
-            )
+            # Convert AgentInfo to DBOS Agent protobuf message, filled in place inside the
+            # request so neither the config map nor the Agent is built once and then copied
+            request = dbos_pb2.RegisterAgentRequest()
+            agent_proto = request.agent
+            agent_proto.id = agent_info.agent_id
+            agent_proto.hostname = agent_info.hostname
+            agent_proto.alive = agent_info.alive
+            agent_proto.last_seen = int(agent_info.last_seen.timestamp())
+            agent_proto.first_seen = int(agent_info.first_seen.timestamp())
+            _encode_config(agent_info.config, agent_proto.config)
+            agent_proto.total_heartbeats = agent_info.total_heartbeats
             
-            request = dbos_pb2.RegisterAgentRequest(agent=agent_proto)
-            response = await self.stub.RegisterAgent(request)
+            response = await self._stub().RegisterAgent(request)
             return response.success
         except Exception as e:
-            print(f"Error registering agent with DBOS: {e}")
+            logger.exception("Error registering agent with DBOS")
             return False
             
     async def get_agent(self, agent_id: str):
         """Get agent information from DBOS"""
-        if not self.stub:
-            await self.connect()
-            
         try:
             request = dbos_pb2.GetAgentRequest(agent_id=agent_id)
-            response = await self.stub.GetAgent(request)
+            response = await self._stub().GetAgent(request)
             
             if response.found:
-                agent_proto = response.agent
                 # Return a dictionary similar to AgentInfo
-                return {
-                    'agent_id': agent_proto.id,
-                    'hostname': agent_proto.hostname,
-                    'alive': agent_proto.alive,
-                    'last_seen': datetime.fromtimestamp(agent_proto.last_seen),
-                    'first_seen': datetime.fromtimestamp(agent_proto.first_seen),
-                    'config': dict(agent_proto.config),
-                    'total_heartbeats': agent_proto.total_heartbeats
-                }
+                return _agent_to_dict(response.agent)
             return None
         except Exception as e:
-            print(f"Error getting agent from DBOS: {e}")
+            logger.exception("Error getting agent from DBOS")
             return None
             
     async def list_agents(self):
         """List all agents from DBOS"""
-        if not self.stub:
-            await self.connect()
-            
         try:
-            request = dbos_pb2.ListAgentsRequest()
-            response = await self.stub.ListAgents(request)
+            response = await self._stub().ListAgents(_LIST_AGENTS_REQUEST)
             
-            agents = []
-            for agent_proto in response.agents:
-                agents.append({
-                    'agent_id': agent_proto.id,
-                    'hostname': agent_proto.hostname,
-                    'alive': agent_proto.alive,
-                    'last_seen': datetime.fromtimestamp(agent_proto.last_seen),
-                    'first_seen': datetime.fromtimestamp(agent_proto.first_seen),
-                    'config': dict(agent_proto.config),
-                    'total_heartbeats': agent_proto.total_heartbeats
-                })
-            return agents
+            return [_agent_to_dict(agent_proto) for agent_proto in response.agents]
         except Exception as e:
-            print(f"Error listing agents from DBOS: {e}")
+            logger.exception("Error listing agents from DBOS")
             return []
             
     async def set_module_state(self, module_state) -> bool:
         """Set module state in DBOS"""
-        if not self.stub:
-            await self.connect()
-            
         try:
             # Convert ModuleState to DBOS ModuleState protobuf message
             state_proto = dbos_pb2.ModuleState(
@@ -120,20 +225,17 @@ class DBOSClient:
             )
             
             request = dbos_pb2.SetModuleStateRequest(state=state_proto)
-            response = await self.stub.SetModuleState(request)
+            response = await self._stub().SetModuleState(request)
             return response.success
         except Exception as e:
-            print(f"Error setting module state in DBOS: {e}")
+            logger.exception("Error setting module state in DBOS")
             return False
             
     async def get_module_state(self, request_id: str):
         """Get module state from DBOS by request ID"""
-        if not self.stub:
-            await self.connect()
-            
         try:
             request = dbos_pb2.GetModuleStateRequest(request_id=request_id)
-            response = await self.stub.GetModuleState(request)
+            response = await self._stub().GetModuleState(request)
             
             if response.found:
                 state_proto = response.state
@@ -148,44 +250,45 @@ class DBOSClient:
                 }
             return None
         except Exception as e:
-            print(f"Error getting module state from DBOS: {e}")
+            logger.exception("Error getting module state from DBOS")
             return None
             
     async def store_result(self, agent_id: str, request_id: str, module_name: str, data: bytes) -> bool:
         """Store measurement result in DBOS"""
-        if not self.stub:
-            await self.connect()
-            
+        request = _STORE_REQUEST_POOL.pop() if _STORE_REQUEST_POOL else dbos_pb2.StoreResultRequest()
         try:
-            result_proto = dbos_pb2.MeasurementResult(
-                id=request_id,
-                agent_id=agent_id,
-                module_name=module_name,
-                data=data,
-                timestamp=int(datetime.now().timestamp())
-            )
+            # Assigned field by field on the pooled message instead of building and copying a new one
+            result_proto = request.result
+            result_proto.id = request_id
+            result_proto.agent_id = agent_id
+            result_proto.module_name = module_name
+            result_proto.data = data
+            # Straight from the clock: a naive now().timestamp() goes through mktime()
+            result_proto.timestamp = int(time.time())
             
-            request = dbos_pb2.StoreResultRequest(result=result_proto)
-            response = await self.stub.StoreResult(request)
+            # Measurement payloads are JSON tables that shrink well; the small control RPCs stay uncompressed
+            response = await self._stub().StoreResult(request, compression=grpc.Compression.Gzip)
             return response.success
         except Exception as e:
-            print(f"Error storing result in DBOS: {e}")
+            logger.exception("Error storing result in DBOS")
             return False
+        finally:
+            # The call has serialized the request by now; drop the payload before pooling it
+            request.Clear()
+            if len(_STORE_REQUEST_POOL) < _STORE_REQUEST_POOL_MAX:
+                _STORE_REQUEST_POOL.append(request)
             
     async def get_result(self, agent_id: str, request_id: str) -> Optional[bytes]:
         """Get measurement result from DBOS"""
-        if not self.stub:
-            await self.connect()
-            
         try:
             request = dbos_pb2.GetResultRequest(agent_id=agent_id, request_id=request_id)
-            response = await self.stub.GetResult(request)
+            response = await self._stub().GetResult(request)
             
             if response.found:
                 return response.result.data
             return None
         except Exception as e:
-            print(f"Error getting result from DBOS: {e}")
+            logger.exception("Error getting result from DBOS")
             return None
 
 # Global DBOS client instance
@@ -195,14 +298,14 @@ async def initialize_dbos_client():
     """Initialize the global DBOS client"""
     global dbos_client
     dbos_address = os.environ.get("DBOS_ADDRESS", "localhost:50051")
-    dbos_client = DBOSClient(dbos_address)
+    pool_size = int(os.environ.get("DBOS_CHANNEL_POOL", "4"))
+    dbos_client = DBOSClient(dbos_address, pool_size)
     await dbos_client.connect()
-    print(f"DBOS client initialized with address: {dbos_address}")
+    logger.info("DBOS client initialized with address: %s", dbos_address)
     
 async def shutdown_dbos_client():
     """Shutdown the global DBOS client"""
     global dbos_client
     if dbos_client:
         await dbos_client.disconnect()
-        dbos_client = None
-        print("DBOS client disconnected")
\ No newline at end of file
+        dbos_client = None
\ No newline at end of file
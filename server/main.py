@@ -20,6 +20,7 @@ from jsonschema.exceptions import ValidationError
 import os
 NATS_URL = [os.environ.get("NATS_URL", "nats://localhost:4222")]
 HEARTBEAT_SUBJECT = "agent.heartbeat_module"
+HEARTBEAT_DELTA_SUBJECT = f"{HEARTBEAT_SUBJECT}.delta"  # Compact "still alive, nothing changed" beats
 HEARTBEAT_INTERVAL = 5                      # Agents send heartbeat every 5s
 HEARTBEAT_TIMEOUT = HEARTBEAT_INTERVAL * 2  # If no heartbeat in 10s => dead
 
@@ -116,9 +117,32 @@ async def nats_connect():
         except Exception as e:
             print("[Cache] Error parsing heartbeat:", e)
 
-    async def module_state_handler(msg: Msg):
+    async def heartbeat_delta_handler(msg: Msg):
         try:
             data = json.loads(msg.data.decode())
+            existing = agent_cache.get(data["a"])
+            if not existing:
+                # Unknown agent (e.g. after a server restart): ask for a full heartbeat on its next
+                # tick rather than waiting out its full_every cycle, which can exceed HEARTBEAT_TIMEOUT
+                await nc.publish(f"agent.{data['a']}.{data['m']}.resync", b"")
+                return
+
+            existing.last_seen = datetime.now(timezone.utc)
+            existing.alive = True
+            existing.total_heartbeats += 1
+
+            if os.environ.get("USE_DBOS", "false").lower() == "true":
+                try:
+                    from dbos_client import dbos_client
+                    if dbos_client:
+                        await dbos_client.register_agent(existing)
+                except Exception as e:
+                    print(f"[DBOS] Error registering agent {existing.agent_id}: {e}")
+        except Exception as e:
+            print("[Cache] Error parsing heartbeat delta:", e)
+
+    async def store_module_state(data: Dict[str, Any]):
+        try:
             agent_id = data["agent_id"]
             module_name = data["module_name"]
             state = data["state"]
@@ -158,7 +182,19 @@ async def nats_connect():
         except Exception as e:
             print("[ModuleState] Error parsing module state:", e)
 
+    async def module_state_handler(msg: Msg):
+        try:
+            data = json.loads(msg.data.decode())
+        except Exception as e:
+            print("[ModuleState] Error parsing module state:", e)
+            return
+
+        # Agents may batch several state reports into a single JSON array
+        for state_data in (data if isinstance(data, list) else [data]):
+            await store_module_state(state_data)
+
     await nc.subscribe(HEARTBEAT_SUBJECT, cb=heartbeat_handler)
+    await nc.subscribe(HEARTBEAT_DELTA_SUBJECT, cb=heartbeat_delta_handler)
     await nc.subscribe("agent.module.state", cb=module_state_handler)
     print(f"[Cache] Subscribed to {HEARTBEAT_SUBJECT} and agent.module.state")
     
@@ -184,9 +220,8 @@ async def subscribe_to_agent_results(agent_id: str):
                     try:
                         from dbos_client import dbos_client
                         if dbos_client:
-                            # Convert data to JSON bytes for DBOS storage
-                            result_data = json.dumps(data).encode('utf-8')
-                            success = await dbos_client.store_result(agent_id, request_id, "unknown", result_data)
+                            # The message body already is the result's JSON, so store it as received
+                            success = await dbos_client.store_result(agent_id, request_id, "unknown", msg.data)
                             if success:
                                 print(f"[DBOS] Stored result for agent {agent_id}, request {request_id}")
                             else:
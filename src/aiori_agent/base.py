@@ -1,19 +1,31 @@
+import os
 import sys
-import time
+import queue
+import atexit
 import asyncio
 import logging
-import json
-from typing import Annotated, Optional, Type
+import logging.handlers
+import orjson
+from typing import Optional, Type
 from enum import Enum
 
-# Configure logging
+from .config import settings
+
+# Configure logging: records are formatted on the calling thread, then written to
+# stdout by a listener thread so handlers never block the event loop on I/O
+_log_queue = queue.SimpleQueue()
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
 )
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger("agent")
 
+STATE_SUBJECT = "agent.module.state"
+
 
 class ModuleStateEnum(str, Enum):
     STARTED = "started"
@@ -33,23 +45,67 @@ class BaseWorker:
         self.logger = logger.getChild(name)
         self.shared = shared
         self.task = None
+        # Strong references to fire-and-forget tasks; the loop itself only keeps weak ones
+        self._background = set()
 
         self.sub_in = None
         self.sub_out = None
         self.sub_err = None
-        
-    async def _report_state(self, state, error_message=None, details=None, request_id=None):
-        """Report module state to NATS"""
-        state_data = {
+
+        # Reused for every state report; only the per-call fields are swapped in
+        self._state_tmpl = {
             "agent_id": self.agent.agent_id,
             "module_name": self.name,
-            "state": state,
-            "error_message": error_message,
-            "details": details,
-            "request_id": request_id  # Include request_id if available
+            "state": None,
+            "error_message": None,
+            "details": None,
+            "request_id": None,
         }
+        self._state_buf = []
+        self._state_flush_task = None
+        # Bound once so the per-message path doesn't go through the settings model
+        self._state_batch_interval = settings.state_batch_interval
+        self._state_batch_size = settings.state_batch_size
+
+    def bind_subjects(self, prefix):
+        """Derive the `.in`/`.out`/`.error` subjects from a common prefix"""
+        self.sub_in = f"{prefix}.in"
+        self.sub_out = f"{prefix}.out"
+        self.sub_err = f"{prefix}.error"
+
+    async def _report_state(self, state, error_message=None, details=None, request_id=None):
+        """Report module state to NATS"""
+        state_data = self._state_tmpl
+        state_data["state"] = state
+        state_data["error_message"] = error_message
+        state_data["details"] = details
+        state_data["request_id"] = request_id  # Include request_id if available
+        if self._state_batch_interval <= 0:
+            try:
+                # Serialized before awaiting, so concurrent reports can't clobber the template
+                await self.nc.publish(STATE_SUBJECT, orjson.dumps(state_data))
+            except Exception as e:
+                self.logger.error(f"Failed to report state: {e}")
+            return
+
+        self._state_buf.append(dict(state_data))
+        if len(self._state_buf) >= self._state_batch_size:
+            await self._flush_states()
+        elif self._state_flush_task is None:
+            self._state_flush_task = asyncio.create_task(self._flush_states_later())
+
+    async def _flush_states_later(self):
+        await asyncio.sleep(self._state_batch_interval)
+        self._state_flush_task = None
+        await self._flush_states()
+
+    async def _flush_states(self):
+        """Publish all buffered state reports as one JSON array"""
+        buf, self._state_buf = self._state_buf, []
+        if not buf:
+            return
         try:
-            await self.nc.publish("agent.module.state", json.dumps(state_data).encode())
+            await self.nc.publish(STATE_SUBJECT, orjson.dumps(buf))
         except Exception as e:
             self.logger.error(f"Failed to report state: {e}")
 
@@ -63,6 +119,46 @@ class BaseWorker:
     async def run(self):
         raise NotImplementedError("Worker must implement run()")
 
+    async def serve(self, subject, handler, workers=None, maxsize=1024):
+        """
+        Subscribe to `subject` and hand messages to a pool of worker tasks.
+
+        The subscription callback only enqueues, so a slow `handler` call no longer
+        holds up every message queued behind it. A full queue blocks the callback,
+        pushing backpressure onto the NATS pending limits. Runs until cancelled.
+        """
+        queue = asyncio.Queue(maxsize=maxsize)
+
+        async def enqueue(msg):
+            await queue.put(msg)
+
+        async def drain():
+            while True:
+                msg = await queue.get()
+                try:
+                    await handler(msg)
+                except Exception:
+                    self.logger.exception(f"{self.name}: Unhandled error in message handler")
+                finally:
+                    queue.task_done()
+
+        subscription = await self.nc.subscribe(
+            subject,
+            cb=enqueue,
+            pending_msgs_limit=settings.nats_pending_msgs_limit,
+            pending_bytes_limit=settings.nats_pending_bytes_limit,
+        )
+        pool = [asyncio.create_task(drain()) for _ in range(workers or os.cpu_count() or 8)]
+        try:
+            await asyncio.gather(*pool)
+        finally:
+            for task in pool:
+                task.cancel()
+            try:
+                await subscription.unsubscribe()
+            except Exception as e:
+                self.logger.warning(f"{self.name}: Failed to unsubscribe from {subject}: {e}")
+
     async def __run__(self, crash_handler):
         try:
             self.running = True
@@ -77,15 +173,21 @@ class BaseWorker:
     def start(self, crash_handler):
         self.task = asyncio.create_task(self.__run__(crash_handler=crash_handler))
         # Report that the module is now running (task created)
-        asyncio.create_task(self._report_state("running"))
+        report = asyncio.create_task(self._report_state("running"))
+        self._background.add(report)
+        report.add_done_callback(self._background.discard)
 
     async def stop(self, msg="Exclusive stop", timeout=20):
         self.task.cancel(msg=msg)
-        ct = time.perf_counter() + timeout
-        while self.task and not self.task.done():
-            if ct < time.perf_counter():
-                raise asyncio.exceptions.TimeoutError()
-            await asyncio.sleep(0.1)
+        # asyncio.wait neither raises the task's CancelledError nor swallows our own
+        _, pending = await asyncio.wait({self.task}, timeout=timeout)
+        if pending:
+            raise asyncio.exceptions.TimeoutError()
         self.running = False
         self.task = None
+        await self._flush_states()
+        # Everything buffered just went out, so the pending timer has nothing left to send
+        if self._state_flush_task is not None:
+            self._state_flush_task.cancel()
+            self._state_flush_task = None
         return True
\ No newline at end of file
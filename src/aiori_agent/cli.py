@@ -1,14 +1,13 @@
-from pathlib import Path
-from typing import Annotated
 import typer
 import asyncio
 
-from .agent import Agent
-
 
 def cli():
     """
     Start the agent and load all modules.
     """
+    # Imported here so the CLI entrypoint doesn't pull in nats/watchdog until needed
+    from .agent import Agent
+
     typer.echo("🚀 Starting agent...")
     asyncio.run(Agent().start())
@@ -9,11 +9,26 @@ class Settings(BaseSettings, cli_parse_args=True, cli_exit_on_error=False):
     agent_id: str = Field(default=str(uuid.uuid4()), env="AGENT_ID")
     agent_name: str = Field(default="AGENT-1", env="AGENT_NAME")
     nats_url: str = Field(default="nats://127.0.0.1:4222", env="NATS_URL")
+    # Debug switches: pedantic makes the server validate every subject and verbose
+    # makes it ack every command with +OK. Both cost a round-trip per publish.
+    nats_pedantic: bool = Field(default=False, env="NATS_PEDANTIC")
+    nats_verbose: bool = Field(default=False, env="NATS_VERBOSE")
+    # Per-subscription buffering before nats-py starts dropping as a slow consumer
+    nats_pending_msgs_limit: int = Field(default=1_000_000, env="NATS_PENDING_MSGS_LIMIT")
+    nats_pending_bytes_limit: int = Field(default=256 * 1024 * 1024, env="NATS_PENDING_BYTES_LIMIT")
+    # Reconnect backoff (seconds): full jitter over an exponentially growing window
+    nats_reconnect_base: float = Field(default=0.1, env="NATS_RECONNECT_BASE")
+    nats_reconnect_max: float = Field(default=10.0, env="NATS_RECONNECT_MAX")
     modules_path: Path = Field(default=Path("modules"))
     error_log_dir: Path = Field(default=Path(".errors"))
     message_log_dir: Path = Field(default=Path(".messages"))
     crash_state_file: Path = Field(default=Path(".errors/crash_state.json"))
     max_crash_retries: int = 3
+
+    # Module state reports are coalesced and published as a JSON array.
+    # Set the interval to 0 to publish every report immediately.
+    state_batch_interval: float = Field(default=0.005, env="STATE_BATCH_INTERVAL")
+    state_batch_size: int = Field(default=64, env="STATE_BATCH_SIZE")
     
     # OTel configuration
     otlp_trace_endpoint: str = Field(default="otel-collector:4317", env="OTLP_TRACE_ENDPOINT")
@@ -27,13 +42,16 @@ class Settings(BaseSettings, cli_parse_args=True, cli_exit_on_error=False):
     #     extra = "forbid"
 
     model_config = SettingsConfigDict(
-        env_file=".env", env_nested_delimiter="_", case_sensitive=False, extra="ignore"
+        env_file=".env", env_nested_delimiter="_", case_sensitive=False, extra="ignore", frozen=True
     )
 
+    def ensure_dirs(self):
+        """
+        Create the working directories and crash state file if missing.
+        """
+        for path in (self.modules_path, self.error_log_dir, self.message_log_dir):
+            path.mkdir(parents=True, exist_ok=True)
+        self.crash_state_file.touch()
 
-settings = Settings()
 
-settings.modules_path.mkdir(parents=True, exist_ok=True)
-settings.error_log_dir.mkdir(parents=True, exist_ok=True)
-settings.message_log_dir.mkdir(parents=True, exist_ok=True)
-settings.crash_state_file.touch()
+settings = Settings()
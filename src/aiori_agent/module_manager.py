@@ -1,13 +1,13 @@
-import os
 import sys
 import asyncio
 import traceback
 import json
+import orjson
 import importlib.util
 from pathlib import Path
 from types import ModuleType
 
-from typing import Dict, Optional
+from typing import Dict
 
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -15,7 +15,7 @@ from watchdog.events import FileSystemEventHandler
 from aiori_agent.utils import camel_to_snake
 
 from .config import settings
-from .base import logger, BaseWorker
+from .base import logger, BaseWorker, STATE_SUBJECT
 
 
 class EventLoopException(Exception):
@@ -34,6 +34,7 @@ class ModuleManager(FileSystemEventHandler):
         self.modules_dir = settings.modules_path
         self.running_workers: Dict[str, BaseWorker] = {}
         self.loaded_modules: Dict[str, ModuleType] = {}
+        self._observer = None
 
     async def start_all(self):
         """
@@ -42,6 +43,26 @@ class ModuleManager(FileSystemEventHandler):
         await self._load_all_modules()
         self._start_watcher()
 
+    async def stop_all(self):
+        """
+        Stop the file watcher and every running worker, while the connection is still open.
+        """
+        if self._observer is not None:
+            self._observer.stop()
+            await asyncio.to_thread(self._observer.join)
+            self._observer = None
+            logger.info("👀 Watchdog stopped")
+
+        for module_name, worker in list(self.running_workers.items()):
+            try:
+                if worker.task:
+                    # Also flushes the worker's buffered state reports
+                    await worker.stop("Agent shutting down.")
+                logger.info(f"⛔ Stopped worker: {module_name}")
+            except Exception as e:
+                logger.error(f"❌ Error stopping worker `{module_name}`: {e}")
+        self.running_workers.clear()
+
     def _start_watcher(self):
         """
         Launch watchdog observer for hot-reloading modules.
@@ -49,6 +70,7 @@ class ModuleManager(FileSystemEventHandler):
         observer = Observer()
         observer.schedule(self, str(self.modules_dir.resolve()), recursive=False)
         observer.start()
+        self._observer = observer
         logger.info("👀 Watchdog started on modules directory")
 
     def on_modified(self, event):
@@ -61,7 +83,8 @@ class ModuleManager(FileSystemEventHandler):
         module_path = Path(event.src_path)
         module_name = module_path.stem
         logger.debug(f"📦 File modified: {module_name}")
-        self.loop.create_task(self._reload_module(module_name, module_path))
+        # Called on the watchdog thread, so hand the reload over to the agent's loop
+        asyncio.run_coroutine_threadsafe(self._reload_module(module_name, module_path), self.loop)
 
     async def _load_all_modules(self):
         """
@@ -102,7 +125,7 @@ class ModuleManager(FileSystemEventHandler):
                     "state": "stopped",
                     "details": {"action": "module_stopped"}
                 }
-                await self.nc.publish("agent.module.state", json.dumps(state_data).encode())
+                await self.nc.publish(STATE_SUBJECT, orjson.dumps(state_data))
 
             # Unload previous module
             if module_name in sys.modules:
@@ -146,7 +169,7 @@ class ModuleManager(FileSystemEventHandler):
                         "state": "started",
                         "details": {"action": "module_loaded"}
                     }
-                    await self.nc.publish("agent.module.state", json.dumps(state_data).encode())
+                    await self.nc.publish(STATE_SUBJECT, orjson.dumps(state_data))
 
         except Exception as e:
             logger.error(f"❌ Error loading module `{module_name}`: {e}")
@@ -165,4 +188,4 @@ class ModuleManager(FileSystemEventHandler):
         with open(error_path, "w") as f:
             json.dump(error_data, f, indent=2)
 
-        await self.nc.publish("agent.error", json.dumps(error_data).encode())
+        await self.nc.publish("agent.error", orjson.dumps(error_data))
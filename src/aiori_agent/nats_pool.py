@@ -0,0 +1,142 @@
+import random
+import asyncio
+from contextlib import asynccontextmanager
+
+from nats_observe.config import NATSotelSettings
+from nats_observe.client import Client as NATSotel
+
+from .base import logger
+from .config import settings
+
+
+class NatsClient:
+    """
+    Manages a shared NATS connection using async context management.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str = settings.nats_url,
+    ):
+        self.name: str = name
+        self.url: list[str] = url.split(";")
+        otel_settings = NATSotelSettings(
+            service_name=self.name,
+            servers=self.url,
+            otlp_trace_endpoint=settings.otlp_trace_endpoint,
+            otlp_logs_endpoint=settings.otlp_logs_endpoint
+        )
+        # logger = logging.getLogger('server')
+        self.nc: NATSotel = NATSotel(otel_settings)
+        self._reconnect_attempt: int = 0
+
+    def _reconnect_backoff(self) -> float:
+        """
+        Full-jitter exponential backoff: a uniform wait in [0, min(max, base * 2^attempt)].
+
+        Keeps a fleet of agents from retrying in lockstep after a broker restart.
+        """
+        ceiling = settings.nats_reconnect_base * 2 ** min(self._reconnect_attempt, 32)
+        return random.uniform(0, min(settings.nats_reconnect_max, ceiling))
+
+    def _set_reconnect_wait(self):
+        # nats-py re-reads this option before every reconnect attempt
+        self.nc.options["reconnect_time_wait"] = self._reconnect_backoff()
+
+    async def __aenter__(self):
+        await self.nc.connect(
+            servers=self.url,
+            error_cb=self.error_cb,
+            closed_cb=self.closed_cb,
+            disconnected_cb=self.disconnected_cb,
+            discovered_server_cb=self.disconnected_server_cb,
+            reconnected_cb=self.reconnected_cb,
+            name=self.name,
+            pedantic=settings.nats_pedantic,
+            verbose=settings.nats_verbose,
+            allow_reconnect=True,
+            # The agent never consumes its own publishes, so don't have them echoed back
+            no_echo=True,
+            reconnect_time_wait=self._reconnect_backoff(),
+            # connect_timeout = ,
+            # max_reconnect_attempts = ,
+            # user = ,
+            # password = ,
+            # user_credentials = ,
+            # user_jwt_cb = ,
+            # signature_cb=
+        )
+        return self.nc
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.nc.is_connected:
+            await self.nc.drain()
+
+    async def close(self):
+        if self.nc.is_connected:
+            await self.nc.close()
+
+    async def disconnected_cb(
+        self,
+    ):
+        logger.warning("Got disconnected!")
+        self._reconnect_attempt = 0
+        self._set_reconnect_wait()
+
+    async def disconnected_server_cb(
+        self,
+    ):
+        logger.warning("Got disconnected server!")
+
+    async def reconnected_cb(
+        self,
+    ):
+        logger.warning(f"Got reconnected to {self.nc.connected_url}")
+        self._reconnect_attempt = 0
+
+    async def error_cb(self, ex: Exception):
+        logger.error(f"There was an error: {ex}")
+        if self.nc.is_reconnecting:
+            # Called once per failed attempt; widen the window for the next one
+            self._reconnect_attempt += 1
+            self._set_reconnect_wait()
+
+    async def closed_cb(
+        self,
+    ):
+        logger.warning("Connection is closed")
+
+
+# Connections shared across the process, keyed by (servers, client name)
+_instances: dict[tuple[tuple[str, ...], str], NatsClient] = {}
+_refcounts: dict[tuple[tuple[str, ...], str], int] = {}
+_lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def get_shared_nc(name: str, url: str = settings.nats_url):
+    """
+    Yield a connected NATS client shared by every caller using the same servers and name.
+
+    The connection is opened by the first user and drained when the last one releases it.
+    """
+    key = (tuple(url.split(";")), name)
+    async with _lock:
+        client = _instances.get(key)
+        if client is None:
+            client = NatsClient(name=name, url=url)
+            await client.__aenter__()
+            _instances[key] = client
+            _refcounts[key] = 0
+        _refcounts[key] += 1
+
+    try:
+        yield client.nc
+    finally:
+        async with _lock:
+            _refcounts[key] -= 1
+            if _refcounts[key] == 0:
+                del _instances[key]
+                del _refcounts[key]
+                await client.__aexit__(None, None, None)
@@ -1,9 +1,15 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 from agent.agent import Agent
+from agent.config import settings
 
 app = FastAPI(title="Agent Control API")
 
+
+@app.on_event("startup")
+async def startup_event():
+    settings.ensure_dirs()
+
 class ModuleCommand(BaseModel):
     name: str
 
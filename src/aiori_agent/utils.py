@@ -3,8 +3,6 @@ import subprocess
 import importlib.util
 from typing import Any
 
-from pydantic import BaseModel
-
 def install_package(package_name: str):
     """Installs a Python package using pip."""
     try:
@@ -18,16 +16,25 @@ def install_package(package_name: str):
                 "--break-system-packages",
             ]
         )
+        # Let the import system see the new package without restarting
+        importlib.invalidate_caches()
         print(f"Successfully installed {package_name}")
     except subprocess.CalledProcessError as e:
         print(f"Error installing {package_name}: {e}")
 
 
-def check_package_availability(package_name: str):
-    """Installs a Python package using pip."""
+# Packages already found importable. This module outlives hot-reloaded workers, so a reloaded
+# module's setup() skips the probe; misses aren't cached since an install can fix them.
+_AVAILABLE_PACKAGES: set[str] = set()
 
+
+def check_package_availability(package_name: str):
+    """Checks whether a Python package can be imported."""
+    if package_name in _AVAILABLE_PACKAGES:
+        return True
     if importlib.util.find_spec(package_name) is None:
         return False
+    _AVAILABLE_PACKAGES.add(package_name)
     return True
 
 
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import orjson
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# aiori_agent's Settings() parses the command line at import; keep pytest's own arguments from it
+sys.argv = sys.argv[:1]
+
+# Workers import their siblings (`heartbeat.utils`, `tcping`) the way the module manager loads them
+for path in (ROOT / "src", ROOT / "modules"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+class FakeSubscription:
+    def __init__(self, subject, cb):
+        self.subject = subject
+        self.cb = cb
+        self.unsubscribed = False
+
+    async def unsubscribe(self):
+        self.unsubscribed = True
+
+
+class FakeNATS:
+    """
+    Stands in for the shared NATS client: publishes are decoded and recorded, subscriptions kept.
+    """
+
+    def __init__(self):
+        self.published = []
+        self.subscriptions = []
+
+    async def publish(self, subject, payload=b""):
+        self.published.append((subject, orjson.loads(payload) if payload else None))
+
+    async def subscribe(self, subject, cb=None, **kwargs):
+        subscription = FakeSubscription(subject, cb)
+        self.subscriptions.append(subscription)
+        return subscription
+
+
+@pytest.fixture
+def nc():
+    return FakeNATS()
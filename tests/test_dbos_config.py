@@ -0,0 +1,79 @@
+"""
+Round trip of agent configs through the DBOS proto's map<string,string>.
+"""
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("grpc")
+pytest.importorskip("google.protobuf")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+import dbos_pb2
+from dbos_client import _LazyConfig, _agent_to_dict, _encode_config
+
+
+CONFIG = {
+    "agent": {"id": "agent-1", "network": {"eth0": {"ipv4": ["10.0.0.2"], "mac": []}}},
+    "module": "heartbeat_module",
+    "tags": {},
+    "timestamp": 1700000000.5,
+    "count": "123",
+    "missing": None,
+}
+
+
+def _encoded(config):
+    agent = dbos_pb2.Agent()
+    _encode_config(config, agent.config)
+    return agent
+
+
+def test_config_round_trip():
+    config = _LazyConfig(_encoded(CONFIG).config)
+    assert dict(config) == CONFIG
+    assert len(config) == len(CONFIG)
+
+
+def test_string_values_stay_strings():
+    config = _LazyConfig(_encoded({"count": "123", "flag": "true"}).config)
+    assert config["count"] == "123"
+    assert config["flag"] == "true"
+
+
+def test_legacy_plain_strings():
+    agent = dbos_pb2.Agent()
+    agent.config["note"] = "not json"
+    assert _LazyConfig(agent.config)["note"] == "not json"
+
+
+def test_values_decode_once():
+    config = _LazyConfig(_encoded(CONFIG).config)
+    assert config["agent"] is config["agent"]
+
+
+def test_missing_key():
+    config = _LazyConfig(_encoded({}).config)
+    with pytest.raises(KeyError):
+        config["agent"]
+    assert config.get("agent") is None
+
+
+def test_agent_to_dict():
+    agent = _encoded(CONFIG)
+    agent.id = "agent-1"
+    agent.hostname = "host"
+    agent.alive = True
+    agent.last_seen = 1700000000
+    agent.first_seen = 1690000000
+    agent.total_heartbeats = 7
+
+    info = _agent_to_dict(agent)
+    assert info["agent_id"] == "agent-1"
+    assert info["last_seen"] == datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+    assert info["first_seen"].tzinfo is timezone.utc
+    assert dict(info["config"]) == CONFIG
+    assert info["total_heartbeats"] == 7
@@ -0,0 +1,75 @@
+"""
+Tick logic of the delta heartbeat: when a full document goes out and when only a delta does.
+"""
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("nats")
+
+from heartbeat.worker import HeartbeatModule
+
+
+def _agent_info(network=None):
+    return {
+        "id": "agent-1",
+        "modules": {"modules": []},
+        "network": network or {"eth0": {"ipv4": ["10.0.0.2"]}},
+        "user": {"working_dir": "/srv"},
+    }
+
+
+def _worker(nc, full_every=3):
+    agent = SimpleNamespace(agent_id="agent-1", agent_name="AGENT-1")
+    return HeartbeatModule("heartbeat_module", agent, nc, logging.getLogger("tests"), {"full_every": full_every})
+
+
+def _send(worker, *infos):
+    async def run():
+        for info in infos:
+            await worker._send_heartbeat(info)
+    asyncio.run(run())
+    return [subject for subject, _ in worker.nc.published]
+
+
+def test_unchanged_heartbeats_become_deltas(nc):
+    worker = _worker(nc, full_every=3)
+    subjects = _send(worker, *(_agent_info() for _ in range(7)))
+    full, delta = worker.sub_out, worker.sub_delta
+    assert subjects == [full, delta, delta, full, delta, delta, full]
+
+
+def test_delta_payload(nc):
+    worker = _worker(nc)
+    _send(worker, _agent_info(), _agent_info())
+    subject, delta = worker.nc.published[-1]
+    assert subject == worker.sub_delta
+    assert delta["a"] == "agent-1"
+    assert delta["m"] == "heartbeat_module"
+    assert delta["h"] == worker._last_hash.hex()
+    assert worker.sub_delta == "agent.heartbeat_module.delta"
+    assert worker.sub_resync == "agent.agent-1.heartbeat_module.resync"
+
+
+def test_change_sends_full_and_restarts_cycle(nc):
+    worker = _worker(nc, full_every=3)
+    changed = _agent_info(network={"eth0": {"ipv4": ["10.0.0.3"]}})
+    subjects = _send(worker, _agent_info(), _agent_info(), changed, changed, changed, changed)
+    full, delta = worker.sub_out, worker.sub_delta
+    assert subjects == [full, delta, full, delta, delta, full]
+
+
+def test_resync_forces_full(nc):
+    worker = _worker(nc, full_every=10)
+    _send(worker, _agent_info(), _agent_info())
+    asyncio.run(worker._handle_resync(None))
+    _send(worker, _agent_info())
+    assert worker.nc.published[-1][0] == worker.sub_out
+
+
+def test_full_every_is_at_least_one(nc):
+    worker = _worker(nc, full_every=0)
+    subjects = _send(worker, _agent_info(), _agent_info())
+    assert subjects == [worker.sub_out, worker.sub_out]
@@ -0,0 +1,92 @@
+"""
+BaseWorker.serve: a subscription that only enqueues, drained by a pool of worker tasks.
+"""
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("nats")
+
+from aiori_agent.base import BaseWorker
+
+
+def _worker(nc):
+    return BaseWorker("probe", SimpleNamespace(agent_id="agent-1"), nc, logging.getLogger("tests"), {})
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def _start(worker, handler, **kwargs):
+    serving = asyncio.create_task(worker.serve("agent.agent-1.in", handler, **kwargs))
+    await _settle()
+    [subscription] = worker.nc.subscriptions
+    return serving, subscription
+
+
+def test_handler_error_keeps_drain_alive(nc):
+    handled = []
+
+    async def handler(msg):
+        handled.append(msg)
+        if msg == "bad":
+            raise RuntimeError("handler failed")
+
+    async def run():
+        serving, subscription = await _start(_worker(nc), handler, workers=1)
+        await subscription.cb("bad")
+        await subscription.cb("good")
+        await _settle()
+        assert not serving.done()
+        serving.cancel()
+        await asyncio.wait({serving})
+
+    asyncio.run(run())
+    assert handled == ["bad", "good"]
+
+
+def test_full_queue_blocks_enqueue(nc):
+    async def run():
+        gate = asyncio.Event()
+
+        async def handler(msg):
+            await gate.wait()
+
+        serving, subscription = await _start(_worker(nc), handler, workers=1, maxsize=1)
+        await subscription.cb("first")   # Taken by the only drain task, which then blocks
+        await _settle()
+        await subscription.cb("second")  # Fills the queue
+        blocked = asyncio.create_task(subscription.cb("third"))
+        await _settle()
+        assert not blocked.done()
+
+        gate.set()
+        await asyncio.wait_for(blocked, timeout=1)
+        serving.cancel()
+        await asyncio.wait({serving})
+
+    asyncio.run(run())
+
+
+def test_cancel_unsubscribes_and_stops_pool(nc):
+    async def handler(msg):
+        pass
+
+    async def run():
+        before = asyncio.all_tasks()
+        serving, subscription = await _start(_worker(nc), handler, workers=3)
+        pool = asyncio.all_tasks() - before - {serving}
+        assert len(pool) == 3
+        assert not subscription.unsubscribed
+
+        serving.cancel()
+        await asyncio.wait({serving})
+        await _settle()
+        assert subscription.unsubscribed
+        assert all(task.done() for task in pool)
+
+    asyncio.run(run())
@@ -0,0 +1,87 @@
+"""
+Batching of BaseWorker state reports: buffered per worker, published as one array.
+"""
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("nats")
+
+from aiori_agent.base import BaseWorker, STATE_SUBJECT
+
+
+def _worker(nc, interval=60.0, size=64):
+    agent = SimpleNamespace(agent_id="agent-1")
+    worker = BaseWorker("probe", agent, nc, logging.getLogger("tests"), {})
+    worker._state_batch_interval = interval
+    worker._state_batch_size = size
+    return worker
+
+
+def test_reports_are_buffered(nc):
+    worker = _worker(nc)
+
+    async def run():
+        await worker._report_state("running", request_id="r1")
+        await worker._report_state("completed", request_id="r1")
+
+    asyncio.run(run())
+    assert nc.published == []
+    assert [s["state"] for s in worker._state_buf] == ["running", "completed"]
+
+
+def test_full_batch_flushes_immediately(nc):
+    worker = _worker(nc, size=2)
+
+    async def run():
+        await worker._report_state("running", request_id="r1")
+        await worker._report_state("error", "boom", request_id="r2")
+
+    asyncio.run(run())
+    [(subject, batch)] = nc.published
+    assert subject == STATE_SUBJECT
+    assert [(s["state"], s["request_id"]) for s in batch] == [("running", "r1"), ("error", "r2")]
+    assert batch[1]["error_message"] == "boom"
+    assert worker._state_buf == []
+
+
+def test_interval_flushes_pending(nc):
+    worker = _worker(nc, interval=0.01)
+
+    async def run():
+        await worker._report_state("running")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    [(subject, batch)] = nc.published
+    assert batch[0]["state"] == "running"
+    assert worker._state_flush_task is None
+
+
+def test_stop_flushes_buffered_reports(nc):
+    worker = _worker(nc)
+
+    async def run():
+        worker.task = asyncio.create_task(asyncio.sleep(3600))
+        await worker._report_state("running", request_id="r1")
+        flush_task = worker._state_flush_task
+        await worker.stop()
+        await asyncio.sleep(0)
+        return flush_task
+
+    flush_task = asyncio.run(run())
+    [(subject, batch)] = nc.published
+    assert batch[0]["request_id"] == "r1"
+    assert worker.task is None
+    assert worker._state_flush_task is None
+    assert flush_task.cancelled()
+
+
+def test_unbatched_reports_publish_directly(nc):
+    worker = _worker(nc, interval=0)
+    asyncio.run(worker._report_state("started"))
+    [(subject, state)] = nc.published
+    assert state["state"] == "started"
+    assert state["agent_id"] == "agent-1"